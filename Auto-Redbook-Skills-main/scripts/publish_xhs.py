@@ -9,6 +9,9 @@
     
     # 通过 API 服务发布
     python publish_xhs.py --title "标题" --desc "描述" --images cover.png card_1.png --api-mode
+    
+    # 批量发布（复用同一个客户端）
+    python publish_xhs.py --batch notes.json
 
 环境变量:
     在同目录或项目根目录下创建 .env 文件，配置：
@@ -20,29 +23,85 @@
     XHS_API_URL=http://localhost:5005
 
 依赖安装:
-    pip install xhs python-dotenv requests
+    pip install xhs python-dotenv requests aiohttp
+    
+    # 可选：更快的 JSON 解析
+    pip install orjson
 """
 
 import argparse
+import asyncio
+import hashlib
 import os
 import sys
 import json
 import re
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from urllib.parse import urlsplit, urlunsplit
+from typing import Callable, List, Optional, Dict, Any, Tuple
+
+# 第三方依赖按需导入：dotenv 在 load_cookie 中，requests / aiohttp 在 ApiPublisher 中，
+# xhs 在 LocalPublisher 中，避免 --help 等场景加载用不到的库
 
+# API 响应解析优先使用 orjson
 try:
-    from dotenv import load_dotenv
-    import requests
-except ImportError as e:
-    print(f"缺少依赖: {e}")
-    print("请运行: pip install python-dotenv requests")
-    sys.exit(1)
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 
-def load_cookie() -> str:
-    """从 .env 文件加载 Cookie"""
-    # 尝试从多个位置加载 .env
+# 图片并发上传数上限，避免触发限流或耗尽连接
+DEFAULT_UPLOAD_CONCURRENCY = 6
+
+# 批量发布时同时进行的笔记数（默认逐条按顺序发布；并发发布需显式开启，注意平台的发布频率限制）
+DEFAULT_NOTE_CONCURRENCY = 1
+
+# API 只读接口的进程内缓存（秒），批量发布时避免重复请求
+HEALTH_CACHE_TTL = 10
+USER_INFO_CACHE_TTL = 60
+
+_CACHE: Dict[Any, Tuple[float, Any]] = {}
+
+# 用户信息磁盘缓存（按 web_session 区分），Cookie 未轮换时跳过网络请求
+USER_CACHE_DIR = Path.home() / '.cache' / 'publish_xhs'
+USER_CACHE_TTL = 24 * 60 * 60
+
+# 按 Cookie 缓存已构建的 XhsClient 及其签名锁，同一进程内多次发布时复用
+_CLIENT_CACHE: Dict[str, Tuple[Any, threading.Lock]] = {}
+_CLIENT_CACHE_LOCK = threading.Lock()
+
+# aiohttp 共享连接器（按事件循环区分），多条笔记之间复用 TCP 连接和 DNS 缓存
+_AIOHTTP_CONNECTORS: Dict[Any, Any] = {}
+
+# 签名必需的 Cookie 字段
+REQUIRED_COOKIE_FIELDS = ('a1', 'web_session')
+_REQUIRED_COOKIE_RE = re.compile(r'(?:^|;)\s*(a1|web_session)\s*=')
+_A1_RE = re.compile(r'(?:^|;)\s*a1\s*=([^;]*)')
+_WEB_SESSION_RE = re.compile(r'(?:^|;)\s*web_session\s*=([^;]*)')
+
+
+def _cached(key: Any, ttl: float, fn: Callable[[], Any]) -> Any:
+    """带 TTL 的简单缓存，fn 返回 None 时不缓存"""
+    now = time.monotonic()
+    hit = _CACHE.get(key)
+    if hit and now - hit[0] < ttl:
+        return hit[1]
+    value = fn()
+    if value is not None:
+        _CACHE[key] = (now, value)
+    return value
+
+
+@lru_cache(maxsize=1)
+def _find_env() -> Optional[Path]:
+    """查找 .env 文件（依次尝试多个位置），结果缓存"""
     env_paths = [
         Path.cwd() / '.env',
         Path(__file__).parent.parent / '.env',
@@ -51,8 +110,23 @@ def load_cookie() -> str:
     
     for env_path in env_paths:
         if env_path.exists():
-            load_dotenv(env_path)
-            break
+            return env_path
+    return None
+
+
+@lru_cache(maxsize=1)
+def load_cookie() -> str:
+    """从 .env 文件加载 Cookie"""
+    try:
+        from dotenv import load_dotenv
+    except ImportError as e:
+        print(f"缺少依赖: {e}")
+        print("请运行: pip install python-dotenv")
+        sys.exit(1)
+    
+    env_path = _find_env()
+    if env_path:
+        load_dotenv(env_path)
     
     cookie = os.getenv('XHS_COOKIE')
     if not cookie:
@@ -69,24 +143,11 @@ def load_cookie() -> str:
     return cookie
 
 
-def parse_cookie(cookie_string: str) -> Dict[str, str]:
-    """解析 Cookie 字符串为字典"""
-    cookies = {}
-    for item in cookie_string.split(';'):
-        item = item.strip()
-        if '=' in item:
-            key, value = item.split('=', 1)
-            cookies[key.strip()] = value.strip()
-    return cookies
-
-
 def validate_cookie(cookie_string: str) -> bool:
     """验证 Cookie 是否包含必要的字段"""
-    cookies = parse_cookie(cookie_string)
-    
-    # 检查必需的 cookie 字段
-    required_fields = ['a1', 'web_session']
-    missing = [f for f in required_fields if f not in cookies]
+    # 检查必需的 cookie 字段（只做成员检查，无需解析完整字典）
+    found = {m.group(1) for m in _REQUIRED_COOKIE_RE.finditer(cookie_string)}
+    missing = [f for f in REQUIRED_COOKIE_FIELDS if f not in found]
     
     if missing:
         print(f"⚠️ Cookie 可能不完整，缺少字段: {', '.join(missing)}")
@@ -96,19 +157,124 @@ def validate_cookie(cookie_string: str) -> bool:
     return True
 
 
+def _short(text: str, limit: int = 50) -> str:
+    """截断过长文本用于日志展示"""
+    return text if len(text) <= limit else text[:limit] + '...'
+
+
+def _user_cache_file(cookie_string: str) -> Optional[Path]:
+    """返回当前 web_session 对应的用户信息缓存文件"""
+    match = _WEB_SESSION_RE.search(cookie_string)
+    web_session = match.group(1).strip() if match else ''
+    if not web_session:
+        return None
+    key = hashlib.sha256(web_session.encode()).hexdigest()[:16]
+    return USER_CACHE_DIR / f'{key}.json'
+
+
+def load_cached_user_info(cookie_string: str) -> Optional[Dict[str, Any]]:
+    """读取未过期的用户信息缓存"""
+    cache_file = _user_cache_file(cookie_string)
+    if cache_file is None:
+        return None
+    try:
+        if time.time() - cache_file.stat().st_mtime >= USER_CACHE_TTL:
+            return None
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_cached_user_info(cookie_string: str, info: Dict[str, Any]):
+    """缓存用户昵称，写入失败时忽略"""
+    cache_file = _user_cache_file(cookie_string)
+    if cache_file is None:
+        return
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump({'nickname': info.get('nickname', '未知')}, f, ensure_ascii=False)
+    except OSError:
+        pass
+
+
+def _emit(lines: List[str]):
+    """一次写出多行日志：减少写调用，并发发布时也不会与其他笔记的日志交错"""
+    sys.stdout.write('\n'.join(lines) + '\n')
+    sys.stdout.flush()
+
+
+def _published_lines(result: Any) -> List[str]:
+    """生成发布成功后的日志行"""
+    lines = ["\n✨ 笔记发布成功！"]
+    if isinstance(result, dict):
+        note_id = result.get('note_id') or result.get('id')
+        if note_id:
+            lines.append(f"  📎 笔记ID: {note_id}")
+            lines.append(f"  🔗 链接: https://www.xiaohongshu.com/explore/{note_id}")
+    return lines
+
+
 def get_api_url() -> str:
     """获取 API 服务地址"""
     return os.getenv('XHS_API_URL', 'http://localhost:5005')
 
 
+def normalize_api_url(api_url: str) -> str:
+    """
+    将 http 地址中的 localhost 替换为 127.0.0.1，跳过每次建立连接时的域名解析
+    （部分系统会先尝试 ::1 再回退到 IPv4，导致明显延迟）
+    """
+    parts = urlsplit(api_url.rstrip('/'))
+    # 仅处理 http：https 证书签发给 localhost，改成 IP 会导致主机名校验失败
+    if parts.scheme != 'http' or parts.hostname != 'localhost':
+        return api_url.rstrip('/')
+    # 保留 user:password@ 部分（原样保留，不重新编码）
+    userinfo, at, _ = parts.netloc.rpartition('@')
+    netloc = userinfo + at + '127.0.0.1' + (f':{parts.port}' if parts.port else '')
+    return urlunsplit(parts._replace(netloc=netloc))
+
+
+def _image_size(path: str) -> Optional[int]:
+    """返回文件大小；文件不存在或不是普通文件时返回 None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size if stat.S_ISREG(st.st_mode) else None
+
+
 def validate_images(image_paths: List[str]) -> List[str]:
-    """验证图片文件是否存在"""
-    valid_images = []
+    """验证图片文件是否存在（每个路径一次 stat，多张图片在线程池中并行），并去除重复图片"""
+    # 按绝对路径去重，保持原有顺序
+    unique: Dict[str, str] = {}
+    duplicates = []
     for path in image_paths:
-        if os.path.exists(path):
-            valid_images.append(os.path.abspath(path))
+        abs_path = os.path.abspath(path)
+        if abs_path in unique:
+            duplicates.append(path)
         else:
+            unique[abs_path] = path
+    
+    if duplicates:
+        print(f"⚠️ 警告: 已忽略重复的图片 - {', '.join(duplicates)}")
+    
+    # 文件系统调用会释放 GIL，网络存储上并行 stat 收益明显
+    if len(unique) <= 1:
+        sizes = [_image_size(abs_path) for abs_path in unique]
+    else:
+        with ThreadPoolExecutor(max_workers=min(32, len(unique))) as executor:
+            sizes = list(executor.map(_image_size, unique.keys()))
+    
+    valid_images = []
+    for (abs_path, path), size in zip(unique.items(), sizes):
+        if size is None:
             print(f"⚠️ 警告: 图片不存在 - {path}")
+        elif size == 0:
+            print(f"⚠️ 警告: 图片为空文件 - {path}")
+        else:
+            valid_images.append(abs_path)
     
     if not valid_images:
         print("❌ 错误: 没有有效的图片文件")
@@ -117,15 +283,86 @@ def validate_images(image_paths: List[str]) -> List[str]:
     return valid_images
 
 
+def load_manifest(manifest_path: str) -> List[Dict[str, Any]]:
+    """
+    读取批量发布清单，格式为 JSON 数组：
+    [{"title": ..., "desc": ..., "images": [...], "private": false, "post_time": null}, ...]
+    """
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            notes = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"❌ 错误: 无法读取批量清单 - {e}")
+        sys.exit(1)
+    
+    if not isinstance(notes, list) or not notes:
+        print("❌ 错误: 批量清单必须是非空的 JSON 数组")
+        sys.exit(1)
+    
+    for i, note in enumerate(notes, 1):
+        if not isinstance(note, dict) or not note.get('title') or not note.get('images'):
+            print(f"❌ 错误: 批量清单第 {i} 条缺少 title 或 images")
+            sys.exit(1)
+        images = note['images']
+        if (not isinstance(note['title'], str)
+                or not isinstance(note.get('desc') or '', str)
+                or not isinstance(images, list)
+                or not all(isinstance(image, str) for image in images)):
+            print(f"❌ 错误: 批量清单第 {i} 条字段类型错误（title/desc 应为字符串，images 应为字符串数组）")
+            sys.exit(1)
+    
+    return notes
+
+
+def prepare_note(note: Dict[str, Any]) -> Dict[str, Any]:
+    """校验单条笔记（标题长度、图片），返回 publish 所需的参数"""
+    title = note['title']
+    if len(title) > 20:
+        print(f"⚠️ 警告: 标题超过20字，将被截断")
+        title = title[:20]
+    
+    # 定时发布时间在上传图片前校验，避免图片传完才因格式错误失败
+    post_time = note.get('post_time')
+    if post_time:
+        post_time = str(post_time)
+        try:
+            datetime.strptime(post_time, "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            print(f"❌ 错误: 定时发布时间格式错误: {post_time}（应为 2024-01-01 12:00:00）")
+            sys.exit(1)
+    
+    return {
+        'title': title,
+        'desc': note.get('desc') or '',
+        'images': validate_images(note['images']),
+        'is_private': bool(note.get('private', False)),
+        'post_time': post_time,
+    }
+
+
 class LocalPublisher:
     """本地发布模式：直接使用 xhs 库"""
     
-    def __init__(self, cookie: str):
+    def __init__(self, cookie: str, concurrency: int = DEFAULT_UPLOAD_CONCURRENCY):
         self.cookie = cookie
+        self.concurrency = max(1, concurrency)
         self.client = None
+        # 签名请求会把 x-s/x-t 等签名头写入客户端共享的 Session 再发送，需串行执行
+        self.sign_lock = None
         
     def init_client(self):
         """初始化 xhs 客户端"""
+        if self.client is not None:
+            return
+        
+        key = hashlib.sha256(self.cookie.encode()).hexdigest()
+        with _CLIENT_CACHE_LOCK:
+            if key not in _CLIENT_CACHE:
+                _CLIENT_CACHE[key] = (self._create_client(), threading.Lock())
+            self.client, self.sign_lock = _CLIENT_CACHE[key]
+    
+    def _create_client(self):
+        """构建 XhsClient（使用本地签名）"""
         try:
             from xhs import XhsClient
             from xhs.help import sign as local_sign
@@ -134,50 +371,123 @@ class LocalPublisher:
             print("请运行: pip install xhs")
             sys.exit(1)
         
-        # 解析 a1 值
-        cookies = parse_cookie(self.cookie)
-        a1 = cookies.get('a1', '')
+        # 只提取 a1 值，无需解析完整 Cookie
+        match = _A1_RE.search(self.cookie)
+        a1 = match.group(1).strip() if match else ''
         
         def sign_func(uri, data=None, a1_param="", web_session=""):
             # 使用 cookie 中的 a1 值
             return local_sign(uri, data, a1=a1 or a1_param)
         
-        self.client = XhsClient(cookie=self.cookie, sign=sign_func)
+        return XhsClient(cookie=self.cookie, sign=sign_func)
         
     def get_user_info(self) -> Optional[Dict[str, Any]]:
-        """获取当前登录用户信息"""
+        """获取当前登录用户信息（优先使用本地缓存）"""
+        cached = load_cached_user_info(self.cookie)
+        if cached:
+            print(f"👤 当前用户: {cached.get('nickname', '未知')}")
+            return cached
+        
         try:
-            info = self.client.get_self_info()
+            with self.sign_lock:
+                info = self.client.get_self_info()
             print(f"👤 当前用户: {info.get('nickname', '未知')}")
+            save_cached_user_info(self.cookie, info)
             return info
         except Exception as e:
             print(f"⚠️ 无法获取用户信息: {e}")
             return None
     
+    def _upload_image(self, path: str) -> Dict[str, Any]:
+        """上传单张图片，返回 create_note 所需的图片信息"""
+        # 获取上传凭证是签名请求，加锁串行；上传文件本身不签名，可并行
+        with self.sign_lock:
+            file_id, token = self.client.get_upload_files_permit("image")
+        self.client.upload_file(file_id, token, path)
+        return {
+            "file_id": file_id,
+            "metadata": {"source": -1},
+            "stickers": {"version": 2, "floating": []},
+            "extra_info_json": '{"mimeType":"image/jpeg"}',
+        }
+    
+    async def upload_images(self, images: List[str],
+                            on_progress: Optional[Callable[[int, int, str], None]] = None
+                            ) -> List[Dict[str, Any]]:
+        """
+        并发上传所有图片（xhs 客户端为同步实现，放到线程中执行）
+        同时进行的上传数不超过 self.concurrency，任一图片失败时取消其余上传
+        """
+        total = len(images)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results: List[Optional[Dict[str, Any]]] = [None] * total
+        in_progress: Dict[int, asyncio.Task] = {}
+        done = 0
+        
+        async def upload(index: int, path: str):
+            nonlocal done
+            async with semaphore:
+                results[index] = await asyncio.to_thread(self._upload_image, path)
+            done += 1
+            if on_progress:
+                on_progress(done, total, path)
+        
+        for index, path in enumerate(images):
+            in_progress[index] = asyncio.create_task(upload(index, path))
+        
+        try:
+            await asyncio.gather(*in_progress.values())
+        except BaseException:
+            # 取消其余上传并等待其结束，避免出现未取回的任务异常
+            for task in in_progress.values():
+                task.cancel()
+            await asyncio.gather(*in_progress.values(), return_exceptions=True)
+            raise
+        
+        return results
+    
+    def _create_note(self, title: str, desc: str, image_infos: List[Dict[str, Any]],
+                     is_private: bool = False, post_time: str = None) -> Dict[str, Any]:
+        """使用已上传的图片创建笔记"""
+        from xhs import NoteType
+        
+        # post_time 保持字符串原样传入，create_note 内部自行转换为时间戳
+        with self.sign_lock:
+            return self.client.create_note(
+                title,
+                desc,
+                NoteType.NORMAL.value,
+                image_info={"images": image_infos},
+                post_time=post_time,
+                is_private=is_private
+            )
+    
     def publish(self, title: str, desc: str, images: List[str], 
                 is_private: bool = False, post_time: str = None) -> Dict[str, Any]:
         """发布图文笔记"""
-        print(f"\n🚀 准备发布笔记（本地模式）...")
-        print(f"  📌 标题: {title}")
-        print(f"  📝 描述: {desc[:50]}..." if len(desc) > 50 else f"  📝 描述: {desc}")
-        print(f"  🖼️ 图片数量: {len(images)}")
+        return asyncio.run(self.publish_async(title, desc, images, is_private, post_time))
+    
+    async def publish_async(self, title: str, desc: str, images: List[str], 
+                            is_private: bool = False, post_time: str = None,
+                            header: List[str] = None) -> Dict[str, Any]:
+        """发布图文笔记（图片并发上传），header 为与开始日志一起输出的前置行"""
+        _emit((header or []) + [
+            f"\n🚀 准备发布笔记（本地模式）...",
+            f"  📌 标题: {title}",
+            f"  📝 描述: {_short(desc)}",
+            f"  🖼️ 图片数量: {len(images)}",
+        ])
         
         try:
-            result = self.client.create_image_note(
-                title=title,
-                desc=desc,
-                files=images,
-                is_private=is_private,
-                post_time=post_time
+            image_infos = await self.upload_images(
+                images,
+                on_progress=lambda done, total, path: print(f"  [{done}/{total}] 已上传: {Path(path).name}")
+            )
+            result = await asyncio.to_thread(
+                self._create_note, title, desc, image_infos, is_private, post_time
             )
             
-            print("\n✨ 笔记发布成功！")
-            if isinstance(result, dict):
-                note_id = result.get('note_id') or result.get('id')
-                if note_id:
-                    print(f"  📎 笔记ID: {note_id}")
-                    print(f"  🔗 链接: https://www.xiaohongshu.com/explore/{note_id}")
-            
+            _emit(_published_lines(result))
             return result
             
         except Exception as e:
@@ -199,22 +509,72 @@ class LocalPublisher:
             raise
 
 
+def _get_aiohttp_session(timeout=None):
+    """创建使用共享连接器的 aiohttp 会话（关闭会话不会关闭连接器）"""
+    import aiohttp
+    
+    loop = asyncio.get_running_loop()
+    connector = _AIOHTTP_CONNECTORS.get(loop)
+    if connector is None or connector.closed:
+        connector = aiohttp.TCPConnector(
+            limit=32,
+            limit_per_host=8,
+            ttl_dns_cache=300,
+            enable_cleanup_closed=True
+        )
+        _AIOHTTP_CONNECTORS[loop] = connector
+    return aiohttp.ClientSession(connector=connector, connector_owner=False, timeout=timeout)
+
+
+async def close_aiohttp_connector():
+    """关闭当前事件循环的共享连接器"""
+    connector = _AIOHTTP_CONNECTORS.pop(asyncio.get_running_loop(), None)
+    if connector is not None:
+        await connector.close()
+
+
 class ApiPublisher:
     """API 发布模式：通过 xhs-api 服务发布"""
     
     def __init__(self, cookie: str, api_url: str = None):
         self.cookie = cookie
-        self.api_url = api_url or get_api_url()
+        self.api_url = normalize_api_url(api_url or get_api_url())
         self.session_id = 'md2redbook_session'
+        self.http = self._create_http_session()
+    
+    @staticmethod
+    def _create_http_session() -> "requests.Session":
+        """创建复用连接的 HTTP 会话（keep-alive + 连接池 + 幂等请求自动重试）"""
+        try:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+        except ImportError as e:
+            print(f"缺少依赖: {e}")
+            print("请运行: pip install requests")
+            sys.exit(1)
+        
+        session = requests.Session()
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=retry)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update({'Connection': 'keep-alive'})
+        return session
         
     def init_client(self):
         """初始化 API 客户端"""
+        import requests
+        
         print(f"📡 连接 API 服务: {self.api_url}")
         
         # 健康检查
+        def check_health() -> Optional[bool]:
+            resp = self.http.get(f"{self.api_url}/health", timeout=5)
+            return True if resp.status_code == 200 else None
+        
         try:
-            resp = requests.get(f"{self.api_url}/health", timeout=5)
-            if resp.status_code != 200:
+            if not _cached((self.api_url, 'health'), HEALTH_CACHE_TTL, check_health):
                 raise Exception("API 服务不可用")
         except requests.exceptions.RequestException as e:
             print(f"❌ 无法连接到 API 服务: {e}")
@@ -224,7 +584,7 @@ class ApiPublisher:
         
         # 初始化 session
         try:
-            resp = requests.post(
+            resp = self.http.post(
                 f"{self.api_url}/init",
                 json={
                     "session_id": self.session_id,
@@ -232,7 +592,7 @@ class ApiPublisher:
                 },
                 timeout=30
             )
-            result = resp.json()
+            result = _json_loads(resp.content)
             
             if resp.status_code == 200 and result.get('status') == 'success':
                 print(f"✅ API 初始化成功")
@@ -249,20 +609,34 @@ class ApiPublisher:
             sys.exit(1)
     
     def get_user_info(self) -> Optional[Dict[str, Any]]:
-        """获取当前登录用户信息"""
-        try:
-            resp = requests.post(
+        """获取当前登录用户信息（优先使用本地缓存）"""
+        cached = load_cached_user_info(self.cookie)
+        if cached:
+            print(f"👤 当前用户: {cached.get('nickname', '未知')}")
+            return cached
+        
+        def fetch_user_info() -> Optional[Dict[str, Any]]:
+            resp = self.http.post(
                 f"{self.api_url}/user/info",
                 json={"session_id": self.session_id},
                 timeout=10
             )
             if resp.status_code == 200:
-                result = resp.json()
+                result = _json_loads(resp.content)
                 if result.get('status') == 'success':
-                    info = result.get('user_info', {})
-                    print(f"👤 当前用户: {info.get('nickname', '未知')}")
-                    return info
+                    return result.get('user_info', {})
             return None
+        
+        try:
+            info = _cached(
+                (self.api_url, self.session_id, 'user/info'),
+                USER_INFO_CACHE_TTL,
+                fetch_user_info
+            )
+            if info is not None:
+                print(f"👤 当前用户: {info.get('nickname', '未知')}")
+                save_cached_user_info(self.cookie, info)
+            return info
         except Exception as e:
             print(f"⚠️ 无法获取用户信息: {e}")
             return None
@@ -270,12 +644,35 @@ class ApiPublisher:
     def publish(self, title: str, desc: str, images: List[str], 
                 is_private: bool = False, post_time: str = None) -> Dict[str, Any]:
         """发布图文笔记"""
-        print(f"\n🚀 准备发布笔记（API 模式）...")
-        print(f"  📌 标题: {title}")
-        print(f"  📝 描述: {desc[:50]}..." if len(desc) > 50 else f"  📝 描述: {desc}")
-        print(f"  🖼️ 图片数量: {len(images)}")
+        async def run():
+            try:
+                return await self.publish_async(title, desc, images, is_private, post_time)
+            finally:
+                await close_aiohttp_connector()
         
+        return asyncio.run(run())
+    
+    async def publish_async(self, title: str, desc: str, images: List[str], 
+                            is_private: bool = False, post_time: str = None,
+                            header: List[str] = None) -> Dict[str, Any]:
+        """发布图文笔记（基于 aiohttp，不阻塞事件循环），header 为与开始日志一起输出的前置行"""
         try:
+            import aiohttp
+        except ImportError:
+            print("❌ 错误: 缺少 aiohttp 库")
+            print("请运行: pip install aiohttp")
+            sys.exit(1)
+        
+        _emit((header or []) + [
+            f"\n🚀 准备发布笔记（API 模式）...",
+            f"  📌 标题: {title}",
+            f"  📝 描述: {_short(desc)}",
+            f"  🖼️ 图片数量: {len(images)}",
+        ])
+        
+        try:
+            # 只传递图片的本地路径，由 xhs-api 服务读取文件，
+            # 因此这里不会把图片内容读入内存
             payload = {
                 "session_id": self.session_id,
                 "title": title,
@@ -286,21 +683,15 @@ class ApiPublisher:
             if post_time:
                 payload["post_time"] = post_time
             
-            resp = requests.post(
-                f"{self.api_url}/publish/image",
-                json=payload,
-                timeout=120
-            )
-            result = resp.json()
+            timeout = aiohttp.ClientTimeout(total=120)
+            async with _get_aiohttp_session(timeout) as session:
+                async with session.post(f"{self.api_url}/publish/image", json=payload) as resp:
+                    status_code = resp.status
+                    result = _json_loads(await resp.read())
             
-            if resp.status_code == 200 and result.get('status') == 'success':
-                print("\n✨ 笔记发布成功！")
+            if status_code == 200 and result.get('status') == 'success':
                 publish_result = result.get('result', {})
-                if isinstance(publish_result, dict):
-                    note_id = publish_result.get('note_id') or publish_result.get('id')
-                    if note_id:
-                        print(f"  📎 笔记ID: {note_id}")
-                        print(f"  🔗 链接: https://www.xiaohongshu.com/explore/{note_id}")
+                _emit(_published_lines(publish_result))
                 return publish_result
             else:
                 raise Exception(result.get('error', '发布失败'))
@@ -311,11 +702,7 @@ class ApiPublisher:
             raise
 
 
-def main():
-    parser = argparse.ArgumentParser(
-        description='将图片发布为小红书笔记',
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog='''
+EPILOG = '''
 示例:
   # 基本用法
   python publish_xhs.py -t "我的标题" -d "正文内容" -i cover.png card_1.png card_2.png
@@ -328,11 +715,49 @@ def main():
   
   # 定时发布
   python publish_xhs.py -t "我的标题" -d "正文内容" -i *.png --post-time "2024-12-01 10:00:00"
+  
+  # 批量发布（notes.json 为笔记数组，字段同上：title/desc/images/private/post_time）
+  python publish_xhs.py --batch notes.json
 '''
+
+
+async def publish_notes(publisher, notes: List[Dict[str, Any]],
+                        concurrency: int = DEFAULT_NOTE_CONCURRENCY) -> int:
+    """
+    并发发布多条笔记，复用同一个已初始化的发布客户端，返回失败数
+    同时进行的笔记数不超过 concurrency（默认 1，按清单顺序依次发布）
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    
+    async def publish_one(index: int, note: Dict[str, Any]) -> bool:
+        async with semaphore:
+            # 序号行与笔记的开始日志一次写出，并发时不会被其他笔记的日志插入
+            header = [f"\n📦 [{index}/{len(notes)}] {note['title']}"] if len(notes) > 1 else None
+            try:
+                await publisher.publish_async(**note, header=header)
+                return True
+            except Exception as e:
+                print(f"❌ [{index}/{len(notes)}] {note['title']} 发布失败: {e}")
+                return False
+    
+    try:
+        results = await asyncio.gather(
+            *[publish_one(i, note) for i, note in enumerate(notes, 1)]
+        )
+    finally:
+        await close_aiohttp_connector()
+    return results.count(False)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(
+        description='将图片发布为小红书笔记',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=EPILOG
     )
     parser.add_argument(
         '--title', '-t',
-        required=True,
         help='笔记标题（不超过20字）'
     )
     parser.add_argument(
@@ -343,7 +768,6 @@ def main():
     parser.add_argument(
         '--images', '-i',
         nargs='+',
-        required=True,
         help='图片文件路径（可以多个）'
     )
     parser.add_argument(
@@ -356,6 +780,19 @@ def main():
         default=None,
         help='定时发布时间（格式：2024-01-01 12:00:00）'
     )
+    parser.add_argument(
+        '--batch',
+        metavar='MANIFEST',
+        default=None,
+        help='批量发布清单（JSON 数组），所有笔记复用同一个客户端'
+    )
+    parser.add_argument(
+        '--note-concurrency',
+        type=int,
+        default=DEFAULT_NOTE_CONCURRENCY,
+        help=f'批量发布时同时发布的笔记数（默认: {DEFAULT_NOTE_CONCURRENCY}，即按清单顺序逐条发布；'
+             f'调大会打乱发布顺序，且发布过快可能触发平台风控）'
+    )
     parser.add_argument(
         '--api-mode',
         action='store_true',
@@ -366,18 +803,41 @@ def main():
         default=None,
         help='API 服务地址（默认: http://localhost:5005）'
     )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=DEFAULT_UPLOAD_CONCURRENCY,
+        help=f'本地模式下图片并发上传数（默认: {DEFAULT_UPLOAD_CONCURRENCY}）'
+    )
+    parser.add_argument(
+        '--verify-user',
+        action='store_true',
+        help='发布前确认当前登录用户（结果按 Cookie 缓存 24 小时）'
+    )
     parser.add_argument(
         '--dry-run',
         action='store_true',
         help='仅验证，不实际发布'
     )
-    
+    return parser
+
+
+def main():
+    parser = build_parser()
     args = parser.parse_args()
     
-    # 验证标题长度
-    if len(args.title) > 20:
-        print(f"⚠️ 警告: 标题超过20字，将被截断")
-        args.title = args.title[:20]
+    if args.batch:
+        raw_notes = load_manifest(args.batch)
+    else:
+        if not args.title or not args.images:
+            parser.error('未使用 --batch 时必须提供 --title 和 --images')
+        raw_notes = [{
+            'title': args.title,
+            'desc': args.desc,
+            'images': args.images,
+            'private': args.private,
+            'post_time': args.post_time,
+        }]
     
     # 加载 Cookie
     cookie = load_cookie()
@@ -385,16 +845,17 @@ def main():
     # 验证 Cookie 格式
     validate_cookie(cookie)
     
-    # 验证图片
-    valid_images = validate_images(args.images)
+    # 验证标题和图片（全部通过后才开始发布）
+    notes = [prepare_note(note) for note in raw_notes]
     
     if args.dry_run:
         print("\n🔍 验证模式 - 不会实际发布")
-        print(f"  📌 标题: {args.title}")
-        print(f"  📝 描述: {args.desc}")
-        print(f"  🖼️ 图片: {valid_images}")
-        print(f"  🔒 私密: {args.private}")
-        print(f"  ⏰ 定时: {args.post_time or '立即发布'}")
+        for note in notes:
+            print(f"  📌 标题: {note['title']}")
+            print(f"  📝 描述: {_short(note['desc'])}")
+            print(f"  🖼️ 图片: {note['images']}")
+            print(f"  🔒 私密: {note['is_private']}")
+            print(f"  ⏰ 定时: {note['post_time'] or '立即发布'}")
         print(f"  📡 模式: {'API' if args.api_mode else '本地'}")
         print("\n✅ 验证通过，可以发布")
         return
@@ -403,23 +864,20 @@ def main():
     if args.api_mode:
         publisher = ApiPublisher(cookie, args.api_url)
     else:
-        publisher = LocalPublisher(cookie)
+        publisher = LocalPublisher(cookie, args.concurrency)
     
-    # 初始化客户端
+    # 初始化客户端（批量发布时只初始化一次）
     publisher.init_client()
     
+    if args.verify_user:
+        publisher.get_user_info()
+    
     # 发布笔记
-    try:
-        publisher.publish(
-            title=args.title,
-            desc=args.desc,
-            images=valid_images,
-            is_private=args.private,
-            post_time=args.post_time
-        )
-    except Exception as e:
+    failed = asyncio.run(publish_notes(publisher, notes, args.note_concurrency))
+    if failed:
+        if len(notes) > 1:
+            print(f"\n❌ {failed}/{len(notes)} 条笔记发布失败")
         sys.exit(1)
 
-
 if __name__ == '__main__':
     main()
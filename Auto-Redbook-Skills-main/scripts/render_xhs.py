@@ -18,7 +18,8 @@
     --width, -w          图片宽度（默认 1080）
     --height, -h         图片高度（默认 1440，dynamic 模式下为最小高度）
     --max-height         dynamic 模式下的最大高度（默认 4320
-    --dpr                设备像素比（默认 2）
+    --dpr                设备像素比（默认 2；设为 1 时像素数为 1/4，渲染和编码更快）
+    --format, -f         图片格式：png（默认）或 jpeg（文件更小、编码更快）
 
 依赖安装:
     pip install markdown pyyaml playwright
@@ -27,17 +28,23 @@
 
 import argparse
 import asyncio
+import html
 import os
 import re
+import string
 import sys
-import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+from urllib.parse import urlparse
+from urllib.request import url2pathname
 
 try:
     import markdown
     import yaml
-    from playwright.async_api import async_playwright
+    from playwright.async_api import async_playwright, BrowserContext
 except ImportError as e:
     print(f"缺少依赖: {e}")
     print("请运行: pip install markdown pyyaml playwright && playwright install chromium")
@@ -48,12 +55,19 @@ except ImportError as e:
 SCRIPT_DIR = Path(__file__).parent.parent
 ASSETS_DIR = SCRIPT_DIR / "assets"
 THEMES_DIR = ASSETS_DIR / "themes"
+FONTS_DIR = ASSETS_DIR / "fonts"
 
 # 默认卡片尺寸配置 (3:4 比例)
 DEFAULT_WIDTH = 1080
 DEFAULT_HEIGHT = 1440
 MAX_HEIGHT = 4320  # dynamic 模式最大高度
 
+# 同时渲染的页面数（过大会显著增加 Chromium 内存占用）
+RENDER_CONCURRENCY = 4
+
+# Markdown 转换最多领先截图的卡片数：已转换但还在等待渲染槽位的卡片不超过该值
+CONVERT_LOOKAHEAD = 2
+
 # 可用主题列表
 AVAILABLE_THEMES = [
     'default',
@@ -66,9 +80,82 @@ AVAILABLE_THEMES = [
     'sketch'
 ]
 
+# 封面背景（按主题）
+_THEME_BG_COVER = {
+    'default': 'linear-gradient(180deg, #f3f3f3 0%, #f9f9f9 100%)',
+    'playful-geometric': 'linear-gradient(180deg, #8B5CF6 0%, #F472B6 100%)',
+    'neo-brutalism': 'linear-gradient(180deg, #FF4757 0%, #FECA57 100%)',
+    'botanical': 'linear-gradient(180deg, #4A7C59 0%, #8FBC8F 100%)',
+    'professional': 'linear-gradient(180deg, #2563EB 0%, #3B82F6 100%)',
+    'retro': 'linear-gradient(180deg, #D35400 0%, #F39C12 100%)',
+    'terminal': 'linear-gradient(180deg, #0D1117 0%, #21262D 100%)',
+    'sketch': 'linear-gradient(180deg, #555555 0%, #999999 100%)'
+}
+
+# 封面标题文字渐变（按主题）
+_THEME_TITLE_GRADIENT = {
+    'default': 'linear-gradient(180deg, #111827 0%, #4B5563 100%)',
+    'playful-geometric': 'linear-gradient(180deg, #7C3AED 0%, #F472B6 100%)',
+    'neo-brutalism': 'linear-gradient(180deg, #000000 0%, #FF4757 100%)',
+    'botanical': 'linear-gradient(180deg, #1F2937 0%, #4A7C59 100%)',
+    'professional': 'linear-gradient(180deg, #1E3A8A 0%, #2563EB 100%)',
+    'retro': 'linear-gradient(180deg, #8B4513 0%, #D35400 100%)',
+    'terminal': 'linear-gradient(180deg, #39D353 0%, #58A6FF 100%)',
+    'sketch': 'linear-gradient(180deg, #111827 0%, #6B7280 100%)',
+}
+
+# 正文卡片背景（按主题）
+_THEME_BG_CARD = {
+    'default': 'linear-gradient(180deg, #f3f3f3 0%, #f9f9f9 100%)',
+    'playful-geometric': 'linear-gradient(135deg, #8B5CF6 0%, #F472B6 100%)',
+    'neo-brutalism': 'linear-gradient(135deg, #FF4757 0%, #FECA57 100%)',
+    'botanical': 'linear-gradient(135deg, #4A7C59 0%, #8FBC8F 100%)',
+    'professional': 'linear-gradient(135deg, #2563EB 0%, #3B82F6 100%)',
+    'retro': 'linear-gradient(135deg, #D35400 0%, #F39C12 100%)',
+    'terminal': 'linear-gradient(135deg, #0D1117 0%, #161B22 100%)',
+    'sketch': 'linear-gradient(135deg, #555555 0%, #888888 100%)'
+}
+
 # 分页模式
 PAGING_MODES = ['separator', 'auto-fit', 'auto-split', 'dynamic']
 
+# 输出图片格式（格式 -> 文件扩展名）
+IMAGE_FORMATS = {'png': 'png', 'jpeg': 'jpg'}
+JPEG_QUALITY = 90
+
+# 正文中的本地图片：卡片以 <base href> 指向该虚拟地址下的 Markdown 所在目录，
+# 绝对路径和相对路径的图片都由路由拦截后读取本地文件
+LOCAL_FILE_URL_PREFIX = 'https://xhs-local.local'
+
+# 本地字体：将 Noto Sans SC 的 woff2 文件放入 assets/fonts/ 即可使用，
+# 页面通过虚拟地址引用，由浏览器上下文的路由拦截并直接读取本地文件（不访问网络）
+FONT_URL_PREFIX = 'https://xhs-fonts.local/'
+# 未提供本地字体文件时回退到 Google Fonts 在线加载（仅此时放行这两个域名的请求）
+GOOGLE_FONTS_CSS_URL = 'https://fonts.googleapis.com/css2?family=Noto+Sans+SC:wght@300;400;500;700;900&display=swap'
+GOOGLE_FONTS_URL_PREFIXES = ('https://fonts.googleapis.com/', 'https://fonts.gstatic.com/')
+FONT_FILES = {
+    300: 'NotoSansSC-Light.woff2',
+    400: 'NotoSansSC-Regular.woff2',
+    500: 'NotoSansSC-Medium.woff2',
+    700: 'NotoSansSC-Bold.woff2',
+    900: 'NotoSansSC-Black.woff2',
+}
+
+# 复用的 Markdown 转换器（每次转换前 reset）；不含代码块的内容走不带 codehilite 的实例，省去 Pygments 开销
+# Markdown 实例不是线程安全的，每个线程各自持有一份
+_MD_EXTENSIONS = ['extra', 'codehilite', 'tables', 'nl2br']
+_MD_PLAIN_EXTENSIONS = ['extra', 'tables', 'nl2br']
+_md_local = threading.local()
+
+# 预编译的正则表达式
+_YAML_RE = re.compile(r'^---\s*\n(.*?)\n---\s*\n', re.DOTALL)  # YAML 头部
+_SEP_RE = re.compile(r'\n---+\n')  # 卡片分隔符
+_PARA_RE = re.compile(r'\n\n+')  # 段落分隔
+_FENCE_RE = re.compile(r'^\s*(```|~~~)')  # 围栏代码块起止
+_CODE_RE = re.compile(r'```|~~~|^(?: {4}|\t)', re.MULTILINE)  # 是否可能包含代码块（任意缩进行都按可能含代码处理）
+_TAGS_RE = re.compile(r'((?:#[\w\u4e00-\u9fa5]+\s*)+)\s*$')  # 末尾标签
+_TAG_FIND_RE = re.compile(r'#([\w\u4e00-\u9fa5]+)')
+
 
 def parse_markdown_file(file_path: str) -> dict:
     """解析 Markdown 文件，提取 YAML 头部和正文内容"""
@@ -76,8 +163,7 @@ def parse_markdown_file(file_path: str) -> dict:
         content = f.read()
     
     # 解析 YAML 头部
-    yaml_pattern = r'^---\s*\n(.*?)\n---\s*\n'
-    yaml_match = re.match(yaml_pattern, content, re.DOTALL)
+    yaml_match = _YAML_RE.match(content)
     
     metadata = {}
     body = content
@@ -97,38 +183,124 @@ def parse_markdown_file(file_path: str) -> dict:
 
 def split_content_by_separator(body: str) -> List[str]:
     """按照 --- 分隔符拆分正文为多张卡片内容"""
-    parts = re.split(r'\n---+\n', body)
+    parts = _SEP_RE.split(body)
     return [part.strip() for part in parts if part.strip()]
 
 
+def _get_markdown(highlight: bool) -> markdown.Markdown:
+    """获取当前线程的 Markdown 转换器（highlight 为 True 时启用 codehilite）"""
+    attr = 'md' if highlight else 'md_plain'
+    md = getattr(_md_local, attr, None)
+    if md is None:
+        md = markdown.Markdown(extensions=_MD_EXTENSIONS if highlight else _MD_PLAIN_EXTENSIONS)
+        setattr(_md_local, attr, md)
+    return md
+
+
 def convert_markdown_to_html(md_content: str) -> str:
-    """将 Markdown 转换为 HTML"""
+    """将 Markdown 转换为 HTML（按是否含代码块选择当前线程复用的转换器）"""
     # 处理 tags（以 # 开头的标签）
-    tags_pattern = r'((?:#[\w\u4e00-\u9fa5]+\s*)+)$'
-    tags_match = re.search(tags_pattern, md_content, re.MULTILINE)
+    tags_match = _TAGS_RE.search(md_content)
     tags_html = ""
     
     if tags_match:
-        tags_str = tags_match.group(1)
         md_content = md_content[:tags_match.start()].strip()
-        tags = re.findall(r'#([\w\u4e00-\u9fa5]+)', tags_str)
+        tags = _TAG_FIND_RE.findall(tags_match.group(1))
         if tags:
-            tags_html = '<div class="tags-container">'
-            for tag in tags:
-                tags_html += f'<span class="tag">#{tag}</span>'
-            tags_html += '</div>'
+            tags_html = '<div class="tags-container">' + ''.join(
+                f'<span class="tag">#{html.escape(tag)}</span>' for tag in tags
+            ) + '</div>'
     
     # 转换 Markdown 为 HTML
-    html = markdown.markdown(
-        md_content,
-        extensions=['extra', 'codehilite', 'tables', 'nl2br']
-    )
+    md = _get_markdown(bool(_CODE_RE.search(md_content)))
+    content_html = md.reset().convert(md_content)
+    
+    return content_html + tags_html
+
+
+@lru_cache(maxsize=512)
+def _convert_paragraph(text: str) -> str:
+    """转换单个段落（缓存结果，auto-split 中重复出现的段落只解析一次）"""
+    return convert_markdown_to_html(text)
+
+
+@lru_cache(maxsize=None)
+def has_local_fonts() -> bool:
+    """assets/fonts 下是否存在任一 Noto Sans SC 字体文件"""
+    return any((FONTS_DIR / filename).exists() for filename in FONT_FILES.values())
+
+
+@lru_cache(maxsize=None)
+def load_font_css() -> str:
+    """
+    生成本地 Noto Sans SC 的 @font-face 规则（仅包含 assets/fonts 下存在的字重）
+    未提供字体文件时回退为 Google Fonts 的 @import，避免无中文字体的环境显示方框
+    """
+    if not has_local_fonts():
+        print(f"  ⚠️ 提示: {FONTS_DIR} 下未找到 Noto Sans SC 字体文件，将从 Google Fonts 在线加载")
+        return f"@import url('{GOOGLE_FONTS_CSS_URL}');"
     
-    return html + tags_html
+    rules = []
+    for weight, filename in FONT_FILES.items():
+        if (FONTS_DIR / filename).exists():
+            rules.append(
+                f"@font-face {{ font-family: 'Noto Sans SC'; font-style: normal; "
+                f"font-weight: {weight}; font-display: swap; "
+                f"src: url('{FONT_URL_PREFIX}{filename}') format('woff2'); }}"
+            )
+    return '\n        '.join(rules)
+
+
+async def serve_local_font(route):
+    """路由处理：从 assets/fonts 返回字体文件（页面与字体不同源，需带 CORS 头才会被 @font-face 使用）"""
+    font_file = FONTS_DIR / Path(route.request.url[len(FONT_URL_PREFIX):]).name
+    if font_file.is_file():
+        await route.fulfill(
+            path=str(font_file),
+            content_type='font/woff2',
+            headers={'Access-Control-Allow-Origin': '*'}
+        )
+    else:
+        await route.abort()
+
 
+def local_base_href(base_dir: Optional[str] = None) -> str:
+    """生成卡片的 <base href>：正文中的本地图片路径相对 base_dir 解析（未指定时仅支持绝对路径）"""
+    if not base_dir:
+        return LOCAL_FILE_URL_PREFIX + '/'
+    return LOCAL_FILE_URL_PREFIX + Path(base_dir).resolve().as_uri()[len('file://'):] + '/'
 
+
+async def serve_local_image(route):
+    """路由处理：按虚拟地址中的路径返回本地图片文件"""
+    image_file = Path(url2pathname(urlparse(route.request.url).path))
+    if route.request.resource_type == 'image' and image_file.is_file():
+        await route.fulfill(path=str(image_file))
+    else:
+        await route.abort()
+
+
+async def route_request(route):
+    """
+    路由处理：本地字体从 assets/fonts 返回；正文中的本地图片从磁盘读取，网络图片照常加载；
+    没有本地字体时放行 Google Fonts；其余网络请求（外部样式、脚本、统计等）全部拦截，避免拖慢页面加载
+    """
+    request = route.request
+    if request.url.startswith(FONT_URL_PREFIX):
+        await serve_local_font(route)
+    elif request.url.startswith(LOCAL_FILE_URL_PREFIX + '/'):
+        await serve_local_image(route)
+    elif request.url.startswith(GOOGLE_FONTS_URL_PREFIXES) and not has_local_fonts():
+        await route.continue_()
+    elif request.url.startswith(('http://', 'https://')) and request.resource_type != 'image':
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+@lru_cache(maxsize=None)
 def load_theme_css(theme: str) -> str:
-    """加载主题 CSS 样式"""
+    """加载主题 CSS 样式（按主题缓存，每个主题只读取一次文件）"""
     theme_file = THEMES_DIR / f"{theme}.css"
     if theme_file.exists():
         with open(theme_file, 'r', encoding='utf-8') as f:
@@ -142,60 +314,29 @@ def load_theme_css(theme: str) -> str:
         return ""
 
 
-def generate_cover_html(metadata: dict, theme: str, width: int, height: int) -> str:
-    """生成封面 HTML"""
-    emoji = metadata.get('emoji', '📝')
-    title = metadata.get('title', '标题')
-    subtitle = metadata.get('subtitle', '')
-    
-    
-    # 动态调整标题字体大小
-    title_len = len(title)
+@lru_cache(maxsize=None)
+def _title_size(title_len: int, width: int) -> int:
+    """根据标题长度动态调整标题字体大小"""
     if title_len <= 6:
-        title_size = int(width * 0.14)  # 极大
+        return int(width * 0.14)  # 极大
     elif title_len <= 10:
-        title_size = int(width * 0.12)  # 大
+        return int(width * 0.12)  # 大
     elif title_len <= 18:
-        title_size = int(width * 0.09)  # 中
+        return int(width * 0.09)  # 中
     elif title_len <= 30:
-        title_size = int(width * 0.07)  # 小
+        return int(width * 0.07)  # 小
     else:
-        title_size = int(width * 0.055) # 极小
-
-    # 获取主题背景色
-    theme_backgrounds = {
-        'default': 'linear-gradient(180deg, #f3f3f3 0%, #f9f9f9 100%)',
-        'playful-geometric': 'linear-gradient(180deg, #8B5CF6 0%, #F472B6 100%)',
-        'neo-brutalism': 'linear-gradient(180deg, #FF4757 0%, #FECA57 100%)',
-        'botanical': 'linear-gradient(180deg, #4A7C59 0%, #8FBC8F 100%)',
-        'professional': 'linear-gradient(180deg, #2563EB 0%, #3B82F6 100%)',
-        'retro': 'linear-gradient(180deg, #D35400 0%, #F39C12 100%)',
-        'terminal': 'linear-gradient(180deg, #0D1117 0%, #21262D 100%)',
-        'sketch': 'linear-gradient(180deg, #555555 0%, #999999 100%)'
-    }
-    bg = theme_backgrounds.get(theme, theme_backgrounds['default'])
-
-    # 封面标题文字渐变随主题变化
-    title_gradients = {
-        'default': 'linear-gradient(180deg, #111827 0%, #4B5563 100%)',
-        'playful-geometric': 'linear-gradient(180deg, #7C3AED 0%, #F472B6 100%)',
-        'neo-brutalism': 'linear-gradient(180deg, #000000 0%, #FF4757 100%)',
-        'botanical': 'linear-gradient(180deg, #1F2937 0%, #4A7C59 100%)',
-        'professional': 'linear-gradient(180deg, #1E3A8A 0%, #2563EB 100%)',
-        'retro': 'linear-gradient(180deg, #8B4513 0%, #D35400 100%)',
-        'terminal': 'linear-gradient(180deg, #39D353 0%, #58A6FF 100%)',
-        'sketch': 'linear-gradient(180deg, #111827 0%, #6B7280 100%)',
-    }
-    title_bg = title_gradients.get(theme, title_gradients['default'])
+        return int(width * 0.055) # 极小
+
+
+@lru_cache(maxsize=None)
+def _cover_style(width: int, height: int, theme: str, title_size: int) -> str:
+    """生成封面的 <style> 块（按尺寸、主题和标题字号缓存）"""
+    bg = _THEME_BG_COVER.get(theme, _THEME_BG_COVER['default'])
+    title_bg = _THEME_TITLE_GRADIENT.get(theme, _THEME_TITLE_GRADIENT['default'])
     
-    html = f'''<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width={width}, height={height}">
-    <title>小红书封面</title>
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Noto+Sans+SC:wght@300;400;500;700;900&display=swap');
+    return f'''<style>
+        {load_font_css()}
         
         * {{
             margin: 0;
@@ -258,43 +399,51 @@ def generate_cover_html(metadata: dict, theme: str, width: int, height: int) ->
             color: #000000;
             margin-top: auto;
         }}
-    </style>
+    </style>'''
+
+
+_COVER_TEMPLATE = string.Template('''<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=${width}, height=${height}">
+    <title>小红书封面</title>
+    ${style}
 </head>
 <body>
     <div class="cover-container">
         <div class="cover-inner">
-            <div class="cover-emoji">{emoji}</div>
-            <div class="cover-title">{title}</div>
-            <div class="cover-subtitle">{subtitle}</div>
+            <div class="cover-emoji">${emoji}</div>
+            <div class="cover-title">${title}</div>
+            <div class="cover-subtitle">${subtitle}</div>
         </div>
     </div>
 </body>
-</html>'''
-    return html
+</html>''')
 
 
-def generate_card_html(content: str, theme: str, page_number: int = 1, 
-                       total_pages: int = 1, width: int = DEFAULT_WIDTH, 
-                       height: int = DEFAULT_HEIGHT, mode: str = 'separator') -> str:
-    """生成正文卡片 HTML"""
+def generate_cover_html(metadata: dict, theme: str, width: int, height: int) -> str:
+    """生成封面 HTML"""
+    emoji = metadata.get('emoji', '📝')
+    title = metadata.get('title', '标题')
+    subtitle = metadata.get('subtitle', '')
     
-    html_content = convert_markdown_to_html(content)
+    return _COVER_TEMPLATE.substitute(
+        width=width,
+        height=height,
+        style=_cover_style(width, height, theme, _title_size(len(title), width)),
+        emoji=html.escape(str(emoji), quote=True),
+        title=html.escape(str(title), quote=True),
+        subtitle=html.escape(str(subtitle), quote=True),
+    )
+
+
+@lru_cache(maxsize=None)
+def _card_style(width: int, height: int, theme: str, mode: str) -> str:
+    """生成正文卡片的 <style> 块（按尺寸、主题和分页模式缓存）"""
     theme_css = load_theme_css(theme)
     
-    page_text = f"{page_number}/{total_pages}" if total_pages > 1 else ""
-    
-    # 获取主题背景色
-    theme_backgrounds = {
-        'default': 'linear-gradient(180deg, #f3f3f3 0%, #f9f9f9 100%)',
-        'playful-geometric': 'linear-gradient(135deg, #8B5CF6 0%, #F472B6 100%)',
-        'neo-brutalism': 'linear-gradient(135deg, #FF4757 0%, #FECA57 100%)',
-        'botanical': 'linear-gradient(135deg, #4A7C59 0%, #8FBC8F 100%)',
-        'professional': 'linear-gradient(135deg, #2563EB 0%, #3B82F6 100%)',
-        'retro': 'linear-gradient(135deg, #D35400 0%, #F39C12 100%)',
-        'terminal': 'linear-gradient(135deg, #0D1117 0%, #161B22 100%)',
-        'sketch': 'linear-gradient(135deg, #555555 0%, #888888 100%)'
-    }
-    bg = theme_backgrounds.get(theme, theme_backgrounds['default'])
+    bg = _THEME_BG_CARD.get(theme, _THEME_BG_CARD['default'])
     
     # 根据模式设置不同的容器样式
     if mode == 'auto-fit':
@@ -356,14 +505,8 @@ def generate_card_html(content: str, theme: str, page_number: int = 1,
         '''
         content_style = ''
     
-    html = f'''<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width={width}">
-    <title>小红书卡片</title>
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Noto+Sans+SC:wght@300;400;500;700;900&display=swap');
+    return f'''<style>
+        {load_font_css()}
         
         * {{
             margin: 0;
@@ -407,176 +550,267 @@ def generate_card_html(content: str, theme: str, page_number: int = 1,
             color: rgba(255, 255, 255, 0.8);
             font-weight: 500;
         }}
-    </style>
+    </style>'''
+
+
+_CARD_TEMPLATE = string.Template('''<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=${width}">
+    <title>小红书卡片</title>
+    <base href="${base_href}">
+    ${style}
 </head>
 <body>
     <div class="card-container">
         <div class="card-inner">
             <div class="card-content">
-                <div class="card-content-scale">{html_content}</div>
+                <div class="card-content-scale">${content}</div>
             </div>
         </div>
-        <div class="page-number">{page_text}</div>
+        <div class="page-number">${page_text}</div>
     </div>
 </body>
-</html>'''
-    return html
+</html>''')
+
+
+@lru_cache(maxsize=None)
+def _get_card_shell(width: int, height: int, theme: str, mode: str,
+                    base_href: str) -> Tuple[str, str, str]:
+    """
+    卡片外壳：除正文内容和页码外的部分只与 (尺寸, 主题, 模式, 图片基准地址) 有关，每种组合只生成一次
+    返回 (prefix, mid, suffix)，卡片 HTML = prefix + 内容 + mid + 页码 + suffix
+    """
+    shell = _CARD_TEMPLATE.safe_substitute(
+        width=width,
+        base_href=html.escape(base_href, quote=True),
+        style=_card_style(width, height, theme, mode)
+    )
+    prefix, rest = shell.split('${content}')
+    mid, suffix = rest.split('${page_text}')
+    return prefix, mid, suffix
 
 
-async def render_html_to_image(html_content: str, output_path: str, 
+def generate_card_html(content: str, theme: str, page_number: int = 1, 
+                       total_pages: int = 1, width: int = DEFAULT_WIDTH, 
+                       height: int = DEFAULT_HEIGHT, mode: str = 'separator',
+                       base_dir: Optional[str] = None) -> str:
+    """生成正文卡片 HTML（base_dir 为正文中相对路径图片的基准目录，通常是 Markdown 文件所在目录）"""
+    
+    html_content = convert_markdown_to_html(content)
+    
+    page_text = f"{page_number}/{total_pages}" if total_pages > 1 else ""
+    
+    prefix, mid, suffix = _get_card_shell(width, height, theme, mode, local_base_href(base_dir))
+    return prefix + html_content + mid + page_text + suffix
+
+
+def write_file_atomic(path: str, data: bytes):
+    """先写同目录下的临时文件再 os.replace，避免中断时留下不完整的图片"""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        # 写入失败时清理临时文件，不在输出目录中留下残留
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+async def render_html_to_image(context: BrowserContext, html_content: str, output_path: str, 
                                width: int = DEFAULT_WIDTH, 
                                height: int = DEFAULT_HEIGHT,
                                mode: str = 'separator',
-                               max_height: int = MAX_HEIGHT,
-                               dpr: int = 2):
-    """使用 Playwright 将 HTML 渲染为图片"""
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
+                               max_height: int = MAX_HEIGHT):
+    """使用 Playwright 将 HTML 渲染为图片（复用传入的浏览器上下文，只新建页面）"""
+    page = await context.new_page()
+    try:
+        # 设置视口大小（上下文默认视口为 width x height）
+        if mode == 'dynamic':
+            await page.set_viewport_size({'width': width, 'height': max_height})
         
-        # 设置视口大小
-        viewport_height = height if mode != 'dynamic' else max_height
-        page = await browser.new_page(
-            viewport={'width': width, 'height': viewport_height},
-            device_scale_factor=dpr
-        )
+        # 直接注入 HTML，无需写临时文件；外部请求已被拦截，load 事件（含正文图片）后即可继续，
+        # 不必再等 networkidle 的 500ms 静默期，字体由下方 evaluate 中的 document.fonts.ready 保证
+        await page.set_content(html_content, wait_until='load')
         
-        # 创建临时 HTML 文件
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as f:
-            f.write(html_content)
-            temp_html_path = f.name
+        # 以下每个分支都只用一次 evaluate：先强制布局触发字体加载、等待字体就绪（代替固定等待），再测量/缩放
+        if mode == 'auto-fit':
+            # 自动缩放模式：对整个内容块做 transform 缩放（标题/代码块等固定 px 也会一起缩放）
+            await page.evaluate('''async () => {
+                void document.body.offsetHeight;
+                await document.fonts.ready;
+                
+                const viewportContent = document.querySelector('.card-content');
+                const scaleEl = document.querySelector('.card-content-scale');
+                if (!viewportContent || !scaleEl) return;
+
+                // 先重置，测量原始尺寸
+                scaleEl.style.transform = 'none';
+                scaleEl.style.width = '';
+                scaleEl.style.height = '';
+
+                const availableWidth = viewportContent.clientWidth;
+                const availableHeight = viewportContent.clientHeight;
+
+                // scrollWidth/scrollHeight 反映内容的自然尺寸
+                const contentWidth = Math.max(scaleEl.scrollWidth, scaleEl.getBoundingClientRect().width);
+                const contentHeight = Math.max(scaleEl.scrollHeight, scaleEl.getBoundingClientRect().height);
+
+                if (!contentWidth || !contentHeight || !availableWidth || !availableHeight) return;
+
+                // 只缩小不放大，避免“撑太大”
+                const scale = Math.min(1, availableWidth / contentWidth, availableHeight / contentHeight);
+
+                // 为避免 transform 后布局尺寸不匹配导致裁切，扩大布局盒子
+                scaleEl.style.width = (availableWidth / scale) + 'px';
+
+                // 顶部对齐更稳；如需居中可计算 offset
+                const offsetX = 0;
+                const offsetY = 0;
+
+                scaleEl.style.transformOrigin = 'top left';
+                scaleEl.style.transform = `translate(${offsetX}px, ${offsetY}px) scale(${scale})`;
+
+                // 等两帧确保缩放已提交绘制，代替固定等待
+                await new Promise(resolve => requestAnimationFrame(() => requestAnimationFrame(resolve)));
+            }''')
+            actual_height = height
         
-        try:
-            await page.goto(f'file://{temp_html_path}')
-            await page.wait_for_load_state('networkidle')
+        else:
+            # 获取实际内容高度
+            content_height = await page.evaluate('''async () => {
+                void document.body.offsetHeight;
+                await document.fonts.ready;
+                const container = document.querySelector('.card-container');
+                return container ? container.scrollHeight : document.body.scrollHeight;
+            }''')
             
-            # 等待字体加载
-            await page.wait_for_timeout(500)
-            
-            if mode == 'auto-fit':
-                # 自动缩放模式：对整个内容块做 transform 缩放（标题/代码块等固定 px 也会一起缩放）
-                await page.evaluate('''() => {
-                    const viewportContent = document.querySelector('.card-content');
-                    const scaleEl = document.querySelector('.card-content-scale');
-                    if (!viewportContent || !scaleEl) return;
-
-                    // 先重置，测量原始尺寸
-                    scaleEl.style.transform = 'none';
-                    scaleEl.style.width = '';
-                    scaleEl.style.height = '';
-
-                    const availableWidth = viewportContent.clientWidth;
-                    const availableHeight = viewportContent.clientHeight;
-
-                    // scrollWidth/scrollHeight 反映内容的自然尺寸
-                    const contentWidth = Math.max(scaleEl.scrollWidth, scaleEl.getBoundingClientRect().width);
-                    const contentHeight = Math.max(scaleEl.scrollHeight, scaleEl.getBoundingClientRect().height);
-
-                    if (!contentWidth || !contentHeight || !availableWidth || !availableHeight) return;
-
-                    // 只缩小不放大，避免“撑太大”
-                    const scale = Math.min(1, availableWidth / contentWidth, availableHeight / contentHeight);
-
-                    // 为避免 transform 后布局尺寸不匹配导致裁切，扩大布局盒子
-                    scaleEl.style.width = (availableWidth / scale) + 'px';
-
-                    // 顶部对齐更稳；如需居中可计算 offset
-                    const offsetX = 0;
-                    const offsetY = 0;
-
-                    scaleEl.style.transformOrigin = 'top left';
-                    scaleEl.style.transform = `translate(${offsetX}px, ${offsetY}px) scale(${scale})`;
-                }''')
-                await page.wait_for_timeout(100)
-                actual_height = height
-                
-            elif mode == 'dynamic':
-                # 动态高度模式：根据内容调整图片高度
-                content_height = await page.evaluate('''() => {
-                    const container = document.querySelector('.card-container');
-                    return container ? container.scrollHeight : document.body.scrollHeight;
-                }''')
-                # 确保高度在合理范围内
+            if mode == 'dynamic':
+                # 动态高度模式：根据内容调整图片高度，确保高度在合理范围内
                 actual_height = max(height, min(content_height, max_height))
-                
             else:  # separator 和 auto-split
-                # 获取实际内容高度
-                content_height = await page.evaluate('''() => {
-                    const container = document.querySelector('.card-container');
-                    return container ? container.scrollHeight : document.body.scrollHeight;
-                }''')
                 actual_height = max(height, content_height)
-            
-            # 截图
-            await page.screenshot(
-                path=output_path,
-                clip={'x': 0, 'y': 0, 'width': width, 'height': actual_height},
-                type='png'
-            )
-            
-            print(f"  ✅ 已生成: {output_path} ({width}x{actual_height})")
-            return actual_height
-            
-        finally:
-            os.unlink(temp_html_path)
-            await browser.close()
-
-
-async def auto_split_content(body: str, theme: str, width: int, height: int, 
-                             dpr: int = 2) -> List[str]:
-    """自动切分内容：根据渲染后的高度自动分页"""
+        
+        # 截图（按扩展名选择格式，JPEG 编码远快于大尺寸 PNG）
+        if output_path.lower().endswith(('.jpg', '.jpeg')):
+            image_options = {'type': 'jpeg', 'quality': JPEG_QUALITY}
+        else:
+            image_options = {'type': 'png'}
+        image_data = await page.screenshot(
+            clip={'x': 0, 'y': 0, 'width': width, 'height': actual_height},
+            **image_options
+        )
+    
+    finally:
+        await page.close()
+    
+    # 页面关闭后在线程池中写文件，磁盘 I/O 不阻塞事件循环，可与其他页面的渲染重叠
+    await asyncio.to_thread(write_file_atomic, output_path, image_data)
+    
+    print(f"  ✅ 已生成: {output_path} ({width}x{actual_height})")
+    return actual_height
+
+
+def _split_paragraphs(body: str) -> List[str]:
+    """按空行切分段落，围栏代码块（``` / ~~~）内的空行不切分（保留代码块内原有的空行）"""
+    paragraphs = []
+    para_start = 0  # 当前段落在 body 中的起点
+    part_start = 0  # 当前片段在 body 中的起点
+    in_fence = False
+    for sep in _PARA_RE.finditer(body):
+        for line in body[part_start:sep.start()].split('\n'):
+            if _FENCE_RE.match(line):
+                in_fence = not in_fence
+        part_start = sep.end()
+        if not in_fence:
+            paragraphs.append(body[para_start:sep.start()])
+            para_start = part_start
+    paragraphs.append(body[para_start:])
+    return paragraphs
+
+
+async def auto_split_content(context: BrowserContext, body: str, theme: str, 
+                             width: int, height: int, base_dir: Optional[str] = None) -> List[str]:
+    """
+    自动切分内容：根据渲染后的高度自动分页
+    每张卡片先按 1、2、4… 个段落倍增试探出上界，再在区间内二分，测量次数只与该卡片的段落数相关
+    每个段落只转换一次 HTML，卡片外壳只加载一次，测量时仅替换内容区的 innerHTML
+    """
+    
+    # 将内容按段落分割，并预先转换为 HTML 片段
+    paragraphs = _split_paragraphs(body)
+    fragments = [_convert_paragraph(p) for p in paragraphs]
     
-    # 将内容按段落分割
-    paragraphs = re.split(r'\n\n+', body)
+    # 内容区域的可用高度（去除 padding 等）
+    available_height = height - 220  # 50*2 padding + 60*2 inner padding
     
     cards = []
-    current_content = []
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
-        page = await browser.new_page(
-            viewport={'width': width, 'height': height * 2},
-            device_scale_factor=dpr
-        )
+    page = await context.new_page()
+    try:
+        await page.set_viewport_size({'width': width, 'height': height * 2})
         
-        try:
-            for para in paragraphs:
-                # 尝试将当前段落加入
-                test_content = current_content + [para]
-                test_md = '\n\n'.join(test_content)
-                
-                html = generate_card_html(test_md, theme, 1, 1, width, height, 'auto-split')
-                
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as f:
-                    f.write(html)
-                    temp_path = f.name
-                
-                await page.goto(f'file://{temp_path}')
-                await page.wait_for_load_state('networkidle')
-                await page.wait_for_timeout(200)
-                
-                content_height = await page.evaluate('''() => {
-                    const content = document.querySelector('.card-content');
-                    return content ? content.scrollHeight : 0;
-                }''')
-                
-                os.unlink(temp_path)
-                
-                # 内容区域的可用高度（去除 padding 等）
-                available_height = height - 220  # 50*2 padding + 60*2 inner padding
-                
-                if content_height > available_height and current_content:
-                    # 当前卡片已满，保存并开始新卡片
-                    cards.append('\n\n'.join(current_content))
-                    current_content = [para]
+        # 加载一次空卡片外壳，后续只替换内容
+        shell_html = generate_card_html('', theme, 1, 1, width, height, 'auto-split', base_dir)
+        await page.set_content(shell_html, wait_until='load')
+        
+        async def fits_html(content_html: str) -> bool:
+            """该 HTML 内容能否放入一张卡片"""
+            # 替换内容后先强制布局（触发新字重的加载），再等待字体和图片就绪后测量，一次往返
+            content_height = await page.evaluate('''async (html) => {
+                document.querySelector('.card-content-scale').innerHTML = html;
+                const content = document.querySelector('.card-content');
+                if (!content) return 0;
+                void content.offsetHeight;
+                await document.fonts.ready;
+                await Promise.all([...document.images].filter(img => !img.complete).map(
+                    img => new Promise(resolve => { img.onload = img.onerror = resolve; })
+                ));
+                return content.scrollHeight;
+            }''', content_html)
+            return content_height <= available_height
+        
+        async def fits(start: int, end: int) -> bool:
+            """paragraphs[start:end] 能否放入一张卡片（用逐段转换的片段近似估计）"""
+            return await fits_html('\n'.join(fragments[start:end]))
+        
+        start = 0
+        while start < len(paragraphs):
+            # 每张卡片至少放入一个段落（单个段落超高时独占一张）
+            lo = start + 1
+            
+            # 倍增试探：lo 个段落放得下，probe 个段落放不下（或超出总数）
+            probe = start + 2
+            while probe <= len(paragraphs) and await fits(start, probe):
+                lo = probe
+                probe = start + (probe - start) * 2
+            hi = min(probe - 1, len(paragraphs))
+            
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if await fits(start, mid):
+                    lo = mid
                 else:
-                    current_content = test_content
+                    hi = mid - 1
             
-            # 保存最后一张卡片
-            if current_content:
-                cards.append('\n\n'.join(current_content))
-                
-        finally:
-            await browser.close()
+            # 逐段转换与整体转换的 HTML 可能不同（引用式链接、松散列表、段尾标签等），
+            # 不同时用实际渲染的整体转换结果复核，放不下则逐段回退
+            while lo > start + 1:
+                card_html = convert_markdown_to_html('\n\n'.join(paragraphs[start:lo]))
+                if card_html == '\n'.join(fragments[start:lo]) or await fits_html(card_html):
+                    break
+                lo -= 1
+            
+            cards.append('\n\n'.join(paragraphs[start:lo]))
+            start = lo
+    
+    finally:
+        await page.close()
     
     return cards
 
@@ -587,7 +821,8 @@ async def render_markdown_to_cards(md_file: str, output_dir: str,
                                    width: int = DEFAULT_WIDTH,
                                    height: int = DEFAULT_HEIGHT,
                                    max_height: int = MAX_HEIGHT,
-                                   dpr: int = 2):
+                                   dpr: int = 2,
+                                   image_format: str = 'png'):
     """主渲染函数：将 Markdown 文件渲染为多张卡片图片"""
     print(f"\n🎨 开始渲染: {md_file}")
     print(f"  📐 主题: {theme}")
@@ -596,35 +831,79 @@ async def render_markdown_to_cards(md_file: str, output_dir: str,
     
     # 确保输出目录存在
     os.makedirs(output_dir, exist_ok=True)
+    ext = IMAGE_FORMATS.get(image_format, 'png')
     
     # 解析 Markdown 文件
     data = parse_markdown_file(md_file)
     metadata = data['metadata']
     body = data['body']
+    # 正文中相对路径的本地图片相对 Markdown 文件所在目录解析
+    base_dir = os.path.dirname(os.path.abspath(md_file))
     
-    # 根据模式处理内容分割
-    if mode == 'auto-split':
-        print("  ⏳ 自动分析内容并切分...")
-        card_contents = await auto_split_content(body, theme, width, height, dpr)
-    else:
-        card_contents = split_content_by_separator(body)
-    
-    total_cards = len(card_contents)
-    print(f"  📄 检测到 {total_cards} 张正文卡片")
-    
-    # 生成封面
-    if metadata.get('emoji') or metadata.get('title'):
-        print("  📷 生成封面...")
-        cover_html = generate_cover_html(metadata, theme, width, height)
-        cover_path = os.path.join(output_dir, 'cover.png')
-        await render_html_to_image(cover_html, cover_path, width, height, 'separator', max_height, dpr)
-    
-    # 生成正文卡片
-    for i, content in enumerate(card_contents, 1):
-        print(f"  📷 生成卡片 {i}/{total_cards}...")
-        card_html = generate_card_html(content, theme, i, total_cards, width, height, mode)
-        card_path = os.path.join(output_dir, f'card_{i}.png')
-        await render_html_to_image(card_html, card_path, width, height, mode, max_height, dpr)
+    # 整个渲染过程只启动一次浏览器，所有卡片共享同一个上下文
+    async with async_playwright() as p:
+        browser = await p.chromium.launch()
+        context = await browser.new_context(
+            viewport={'width': width, 'height': height},
+            device_scale_factor=dpr
+        )
+        # 字体从本地提供，拦截不需要的网络请求
+        await context.route('**/*', route_request)
+        # 单线程转换器：只有这一个线程（和主线程）各自持有 Markdown 实例
+        converter = ThreadPoolExecutor(max_workers=1)
+        
+        try:
+            # 根据模式处理内容分割
+            if mode == 'auto-split':
+                print("  ⏳ 自动分析内容并切分...")
+                card_contents = await auto_split_content(context, body, theme, width, height, base_dir)
+            else:
+                card_contents = split_content_by_separator(body)
+            
+            total_cards = len(card_contents)
+            print(f"  📄 检测到 {total_cards} 张正文卡片")
+            
+            # 封面和正文卡片并发渲染，同时打开的页面数不超过 RENDER_CONCURRENCY
+            semaphore = asyncio.Semaphore(RENDER_CONCURRENCY)
+            # Markdown 转换在单独的一个线程中按卡片顺序进行，与截图重叠；
+            # 已转换未渲染完的卡片不超过 RENDER_CONCURRENCY + CONVERT_LOOKAHEAD，即最多领先 CONVERT_LOOKAHEAD 张
+            lookahead = asyncio.Semaphore(RENDER_CONCURRENCY + CONVERT_LOOKAHEAD)
+            loop = asyncio.get_running_loop()
+            
+            async def render_cover():
+                async with semaphore:
+                    print("  📷 生成封面...")
+                    cover_html = generate_cover_html(metadata, theme, width, height)
+                    cover_path = os.path.join(output_dir, f'cover.{ext}')
+                    await render_html_to_image(context, cover_html, cover_path, width, height, 'separator', max_height)
+            
+            async def render_card(i: int, content: str):
+                async with lookahead:
+                    card_html = await loop.run_in_executor(
+                        converter, generate_card_html,
+                        content, theme, i, total_cards, width, height, mode, base_dir
+                    )
+                    async with semaphore:
+                        print(f"  📷 生成卡片 {i}/{total_cards}...")
+                        card_path = os.path.join(output_dir, f'card_{i}.{ext}')
+                        await render_html_to_image(context, card_html, card_path, width, height, mode, max_height)
+            
+            jobs = [render_card(i, content) for i, content in enumerate(card_contents, 1)]
+            if metadata.get('emoji') or metadata.get('title'):
+                jobs.insert(0, render_cover())
+            tasks = [asyncio.ensure_future(job) for job in jobs]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                # 任一卡片失败时先取消并等待其余任务结束，再关闭浏览器
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+        
+        finally:
+            converter.shutdown(wait=False, cancel_futures=True)
+            await browser.close()
     
     print(f"\n✨ 渲染完成！图片已保存到: {output_dir}")
     return total_cards
@@ -695,7 +974,13 @@ def main():
         '--dpr',
         type=int,
         default=2,
-        help='设备像素比（默认: 2）'
+        help='设备像素比（默认: 2，清晰度高；设为 1 时像素数为 1/4，渲染和编码更快）'
+    )
+    parser.add_argument(
+        '--format', '-f',
+        choices=list(IMAGE_FORMATS.keys()),
+        default='png',
+        help='图片格式（默认: png；jpeg 文件更小、编码更快）'
     )
     
     args = parser.parse_args()
@@ -712,7 +997,8 @@ def main():
         width=args.width,
         height=args.height,
         max_height=args.max_height,
-        dpr=args.dpr
+        dpr=args.dpr,
+        image_format=args.format
     ))
 
 